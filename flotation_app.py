@@ -1,117 +1,9 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import time
 import random
-import base64
-
-# Your existing lookup tables (abbreviated for demo)
-COLLECTOR_LOOKUP = {
-    200: {"recovery": 15.0, "grade": 55.0},
-    400: {"recovery": 46.0, "grade": 52.5},
-    650: {"recovery": 70.0, "grade": 50.0},
-    900: {"recovery": 85.0, "grade": 47.5},
-    1100: {"recovery": 93.0, "grade": 45.0},
-    1500: {"recovery": 97.2, "grade": 40.0}
-}
-
-AIR_RATE_LOOKUP = {
-    500: {"recovery": 30.0, "grade": 58.0},
-    1500: {"recovery": 92.0, "grade": 22.0}
-}
-
-FROTHER_LOOKUP = {
-    0: {"recovery": 60.0, "grade": 47.0},
-    25: {"recovery": 80.0, "grade": 52.0},
-    50: {"recovery": 86.5, "grade": 54.0},
-    75: {"recovery": 80.0, "grade": 50.0},
-    100: {"recovery": 66.0, "grade": 45.0}
-}
-
-PH_LOOKUP = {
-    8.5: {"recovery_multiplier": 1.0, "grade_bonus": 0.0},
-    9.0: {"recovery_multiplier": 1.0, "grade_bonus": 3.9},
-    9.5: {"recovery_multiplier": 1.0, "grade_bonus": 4.5},
-    10.0: {"recovery_multiplier": 0.98, "grade_bonus": 5.0},
-    10.5: {"recovery_multiplier": 0.95, "grade_bonus": 5.5},
-    11.0: {"recovery_multiplier": 0.90, "grade_bonus": 7.5},
-    12.0: {"recovery_multiplier": 0.40, "grade_bonus": 10.5}
-}
-
-def interpolate_lookup(value, lookup_table):
-    """Interpolate between lookup table values"""
-    keys = sorted(lookup_table.keys())
-    
-    if value <= keys[0]:
-        return lookup_table[keys[0]]
-    if value >= keys[-1]:
-        return lookup_table[keys[-1]]
-    
-    # Find surrounding keys
-    for i in range(len(keys) - 1):
-        if keys[i] <= value <= keys[i + 1]:
-            lower_key, upper_key = keys[i], keys[i + 1]
-            break
-    
-    # Linear interpolation
-    weight = (value - lower_key) / (upper_key - lower_key)
-    result = {}
-    
-    for param in lookup_table[lower_key]:
-        lower_val = lookup_table[lower_key][param]
-        upper_val = lookup_table[upper_key][param]
-        result[param] = lower_val + weight * (upper_val - lower_val)
-    
-    return result
 
-def calculate_performance(collector, air_rate, frother, ph, luproset, mn_grade, zn_feed_grade):
-    """Calculate flotation performance from parameters"""
-    
-    # Get individual effects
-    collector_metrics = interpolate_lookup(collector, COLLECTOR_LOOKUP)
-    air_metrics = interpolate_lookup(air_rate, AIR_RATE_LOOKUP)
-    frother_metrics = interpolate_lookup(frother, FROTHER_LOOKUP)
-    ph_metrics = interpolate_lookup(ph, PH_LOOKUP)
-    
-    # NEW: Calculate grade recovery factor based on Zn feed grade
-    # Higher feed grades have better recovery potential
-    # Scale from 0.6 (at 2% Zn) to 1.0 (at 15% Zn)
-    grade_recovery_factor = 0.7 + ((zn_feed_grade - 2.0) / (15.0 - 2.0)) * 0.4
-    
-    # Weighted combination with feed grade factor
-    base_recovery = (collector_metrics["recovery"] * 0.40 + 
-                    air_metrics["recovery"] * 0.25 + 
-                    frother_metrics["recovery"] * 0.15 +
-                    88.0 * 0.25) * grade_recovery_factor
-    
-    # Apply pH multiplier
-    recovery = base_recovery * ph_metrics["recovery_multiplier"]
-    
-    # Luproset reduces recovery slightly
-    recovery -= luproset * 0.015
-    
-    # Grade calculation - higher feed grades can achieve slightly higher concentrate grades
-    feed_grade_bonus = (zn_feed_grade - 8.0) * 0.3  # Bonus/penalty from 8% baseline
-    
-    base_grade = (collector_metrics["grade"] * 0.45 + 
-                 air_metrics["grade"] * 0.30 + 
-                 frother_metrics["grade"] * 0.15 +
-                 50.0 * 0.10)
-    
-    grade = base_grade + ph_metrics["grade_bonus"] - (mn_grade*3) + feed_grade_bonus
-    
-    # Carbon content (affected by luproset)
-    carbon = 2.0 * np.exp(-luproset * 0.02)
-    
-    # Constraints
-    recovery = max(0, min(100, recovery))
-    grade = max(20, min(65, grade))
-    carbon = max(0.5, carbon)
-    
-    return recovery, grade, carbon
+import flotation_model
 
 def calculate_targets(mn_grade):
     """Calculate target grade and recovery based on feed Mn grade.
@@ -122,6 +14,129 @@ def calculate_targets(mn_grade):
     target_recovery = 76.0  # 80% of ~95% practical max
     return target_recovery, target_grade
 
+# Layout settings that never depend on the inputs
+GRADE_RECOVERY_LAYOUT = dict(
+    title="Grade-Recovery Performance",
+    xaxis_title="Zinc Recovery (%)",
+    yaxis_title="Zinc Grade (%)",
+    showlegend=True,
+    xaxis=dict(range=[0, 100]),
+    yaxis=dict(range=[20, 65])
+)
+
+RADAR_LAYOUT = dict(
+    polar=dict(
+        radialaxis=dict(
+            visible=True,
+            range=[0, 100]
+        )),
+    title="Parameter Settings Radar"
+)
+
+SWEEP_LAYOUT = dict(
+    xaxis_title="Collector Dosage (ml/min)",
+    yaxis_title="Air Rate (m³/hr)",
+    showlegend=False
+)
+
+# Figures are cached with cache_resource, which hands back the same object:
+# cache_data would unpickle (and so rebuild and revalidate) the figure on every
+# hit, costing more than building it. st.plotly_chart doesn't mutate the figure.
+@st.cache_resource(max_entries=256, show_spinner=False)
+def build_grade_recovery_fig(recovery, grade, zn_feed_grade, target_recovery, target_grade):
+    """Grade-recovery plot of the current operating point against the target zone"""
+    # Built in one constructor call so Plotly validates the figure once
+    return go.Figure(
+        data=[
+            # Current operating point
+            go.Scatter(
+                x=[recovery], y=[grade],
+                mode='markers',
+                marker=dict(size=15, color='red', symbol='star'),
+                name=f'Current Operation (Feed: {zn_feed_grade}% Zn)',
+                hovertemplate='Recovery: %{x:.1f}%<br>Grade: %{y:.1f}%<extra></extra>'
+            )
+        ],
+        layout=dict(
+            **GRADE_RECOVERY_LAYOUT,
+            shapes=[
+                # Shade the acceptable operating zone (recovery >= target AND grade >= target)
+                dict(type="rect",
+                     x0=target_recovery, y0=target_grade,
+                     x1=100, y1=65,
+                     fillcolor="lightgreen", opacity=0.25,
+                     line=dict(width=0)),
+                # Border lines along the two threshold edges
+                dict(type="line", x0=target_recovery, y0=target_grade, x1=target_recovery, y1=65,
+                     line=dict(color="green", width=1.5, dash="dash")),
+                dict(type="line", x0=target_recovery, y0=target_grade, x1=100, y1=target_grade,
+                     line=dict(color="green", width=1.5, dash="dash")),
+            ],
+            annotations=[
+                # Label the zone boundary
+                dict(x=target_recovery + 1, y=64,
+                     text=f"<b>Target zone<br>R≥{target_recovery:.0f}% | G≥{target_grade:.0f}%</b>",
+                     showarrow=False, xanchor="left",
+                     font=dict(color="darkgreen", size=13),
+                     bgcolor="white", bordercolor="green", borderwidth=1, opacity=0.85),
+            ]
+        )
+    )
+
+# Radar axes are scaled to 0-100 as (value - offset) * scale, in the order
+# collector, air rate, frother, pH, Luproset, feed Zn grade
+RADAR_OFFSETS = np.array([200, 500, 0, 8.5, 0, 2.0])
+RADAR_SCALES = np.array([100 / (1500 - 200), 100 / (1500 - 500), 1.0,
+                         100 / (12 - 8.5), 1.0, 100 / (15.0 - 2.0)])
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def build_radar_fig(values):
+    """Radar chart of the parameter settings, each scaled to 0-100"""
+    params = ['Collector', 'Air Rate', 'Frother', 'pH', 'Luproset', 'Feed Zn Grade']
+    
+    return go.Figure(
+        data=[go.Scatterpolar(
+            r=values,
+            theta=params,
+            fill='toself',
+            name='Current Settings'
+        )],
+        layout=RADAR_LAYOUT
+    )
+
+# Collector x air rate grid for the sweep heatmaps
+SWEEP_COLLECTOR = np.linspace(200, 1500, 50)
+SWEEP_AIR_RATE = np.linspace(500, 1500, 50)
+
+def sweep_performance(frother, ph, luproset, mn_grade, zn_feed_grade):
+    """Recovery and grade over the collector x air rate grid, other settings held fixed"""
+    recovery, grade, _ = flotation_model.calculate_performance_batch(
+        SWEEP_COLLECTOR, SWEEP_AIR_RATE[:, np.newaxis], frother, ph, luproset, mn_grade, zn_feed_grade
+    )
+    # float32 halves the heatmap payload sent to the browser; the extra precision is never displayed
+    return recovery.astype(np.float32), grade.astype(np.float32)
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def build_sweep_fig(z, title, colorbar_title, collector, air_rate):
+    """Heatmap of a swept metric with the current operating point marked"""
+    return go.Figure(
+        data=[
+            go.Heatmap(
+                x=SWEEP_COLLECTOR, y=SWEEP_AIR_RATE, z=z,
+                colorscale='Viridis',
+                colorbar=dict(title=colorbar_title),
+                hovertemplate='Collector: %{x:.0f}<br>Air Rate: %{y:.0f}<br>%{z:.1f}%<extra></extra>'
+            ),
+            go.Scatter(
+                x=[collector], y=[air_rate],
+                mode='markers',
+                marker=dict(size=15, color='red', symbol='star'),
+                name='Current Operation'
+            )
+        ],
+        layout=dict(title=title, **SWEEP_LAYOUT)
+    )
+
 # Streamlit App
 st.set_page_config(
     page_title="Zinc Flotation Simulator",
@@ -129,13 +144,11 @@ st.set_page_config(
     layout="wide"
 )
 
-def set_background(image_path):
-    with open(image_path, "rb") as f:
-        img_data = base64.b64encode(f.read()).decode()
+def set_background(image_url):
     st.markdown(f"""
         <style>
         .stApp {{
-            background-image: url("data:image/jpeg;base64,{img_data}");
+            background-image: url("{image_url}");
             background-size: cover;
             background-position: center;
             background-attachment: fixed;
@@ -143,25 +156,29 @@ def set_background(image_path):
         </style>
     """, unsafe_allow_html=True)
 
-set_background("assets/background.jpg")
+# Served from ./static (see .streamlit/config.toml) so the browser fetches and
+# caches the image once instead of receiving it inline on every rerun
+set_background("app/static/background.jpg")
 
 st.markdown("<h1 style='text-align: center;'>DRM Zinc Flotation</h1>", unsafe_allow_html=True)
 
 # Initialize session state for all parameters if not exists
-if 'zn_feed_grade' not in st.session_state:
-    st.session_state.zn_feed_grade = 8.0
-if 'mn_grade' not in st.session_state:
-    st.session_state.mn_grade = 0.8
-if 'collector' not in st.session_state:
-    st.session_state.collector = 200
-if 'air_rate' not in st.session_state:
-    st.session_state.air_rate = 500
-if 'frother' not in st.session_state:
-    st.session_state.frother = 0
-if 'ph' not in st.session_state:
-    st.session_state.ph = 8.5
-if 'luproset' not in st.session_state:
-    st.session_state.luproset = 0
+DEFAULTS = {
+    "zn_feed_grade": 8.0,
+    "mn_grade": 0.8,
+    "collector": 200,
+    "air_rate": 500,
+    "frother": 0,
+    "ph": 8.5,
+    "luproset": 0,
+}
+for key, value in DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+
+def reset_parameters():
+    """Restore every input to its default; runs as a callback, before the widgets are drawn"""
+    for key, value in DEFAULTS.items():
+        st.session_state[key] = value
 
 # Sidebar controls
 st.sidebar.header("Feed Characteristics")
@@ -173,13 +190,11 @@ if st.sidebar.button("🎲 New Scenario", help="Generate new random operating co
     st.session_state.mn_grade = round(random.uniform(0.2, 1.0), 1)
     
     # Reset control variables to minimum so operator must dial in from scratch
-    st.session_state.collector = 200
-    st.session_state.air_rate = 500
-    st.session_state.frother = 0
-    st.session_state.ph = 8.5
-    st.session_state.luproset = 0
-    
-    st.rerun()
+    for key, value in DEFAULTS.items():
+        if key not in ("zn_feed_grade", "mn_grade"):
+            st.session_state[key] = value
+    # No st.rerun(): the click already triggered this run, and the inputs
+    # below haven't been drawn yet so they pick up the new values directly
 
 
 mn_grade = st.sidebar.number_input(
@@ -215,7 +230,7 @@ luproset = st.sidebar.number_input(
 )
 
 # Calculate current performance using session state feed grade
-recovery, grade, carbon = calculate_performance(
+recovery, grade, carbon = flotation_model.calculate_performance(
     collector, air_rate, frother, ph, luproset, mn_grade, st.session_state.zn_feed_grade
 )
 
@@ -261,85 +276,33 @@ with col1:
     # Calculate dynamic target based on feed Mn grade
     target_recovery, target_grade = calculate_targets(mn_grade)
 
-    # Grade-Recovery plot
-    fig1 = go.Figure()
-
-    # Add current operating point
-    fig1.add_scatter(
-        x=[recovery], y=[grade],
-        mode='markers',
-        marker=dict(size=15, color='red', symbol='star'),
-        name=f'Current Operation (Feed: {st.session_state.zn_feed_grade}% Zn)',
-        hovertemplate='Recovery: %{x:.1f}%<br>Grade: %{y:.1f}%<extra></extra>'
-    )
-
-    # Shade the acceptable operating zone (recovery >= target AND grade >= target)
-    fig1.add_shape(
-        type="rect",
-        x0=target_recovery, y0=target_grade,
-        x1=100, y1=65,
-        fillcolor="lightgreen", opacity=0.25,
-        line=dict(width=0)
-    )
-    # Border lines along the two threshold edges
-    fig1.add_shape(type="line", x0=target_recovery, y0=target_grade, x1=target_recovery, y1=65,
-                   line=dict(color="green", width=1.5, dash="dash"))
-    fig1.add_shape(type="line", x0=target_recovery, y0=target_grade, x1=100, y1=target_grade,
-                   line=dict(color="green", width=1.5, dash="dash"))
-
-    # Label the zone boundary
-    fig1.add_annotation(
-        x=target_recovery + 1, y=64,
-        text=f"<b>Target zone<br>R≥{target_recovery:.0f}% | G≥{target_grade:.0f}%</b>",
-        showarrow=False, xanchor="left",
-        font=dict(color="darkgreen", size=13),
-        bgcolor="white", bordercolor="green", borderwidth=1, opacity=0.85
+    fig1 = build_grade_recovery_fig(
+        recovery, grade, st.session_state.zn_feed_grade, target_recovery, target_grade
     )
-    
-    fig1.update_layout(
-        title="Grade-Recovery Performance",
-        xaxis_title="Zinc Recovery (%)",
-        yaxis_title="Zinc Grade (%)",
-        showlegend=True,
-        xaxis=dict(range=[0, 100]),
-        yaxis=dict(range=[20, 65])
-    )
-    
     st.plotly_chart(fig1, use_container_width=True)
 
 with col2:
     # Parameter effects radar chart
-    params = ['Collector', 'Air Rate', 'Frother', 'pH', 'Luproset', 'Feed Zn Grade']
-    values = [
-        (collector - 200) / (1500 - 200) * 100,
-        (air_rate - 500) / (1500 - 500) * 100,
-        frother, 
-        (ph-8.5)/(12-8.5)*100, 
-        luproset,
-        (st.session_state.zn_feed_grade-2.0)/(15.0-2.0)*100
-    ]
-    
-    fig2 = go.Figure()
-    
-    fig2.add_trace(go.Scatterpolar(
-        r=values,
-        theta=params,
-        fill='toself',
-        name='Current Settings'
-    ))
-    
-    fig2.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100]
-            )),
-        title="Parameter Settings Radar"
-    )
+    values = (np.array([collector, air_rate, frother, ph, luproset,
+                        st.session_state.zn_feed_grade]) - RADAR_OFFSETS) * RADAR_SCALES
     
+    fig2 = build_radar_fig(values)
     st.plotly_chart(fig2, use_container_width=True)
 
+# Collector x air rate sweep at the current frother, pH and Luproset settings
+sweep_recovery, sweep_grade = sweep_performance(
+    frother, ph, luproset, mn_grade, st.session_state.zn_feed_grade
+)
+
+col1, col2 = st.columns(2)
+
+with col1:
+    fig3 = build_sweep_fig(sweep_recovery, "Recovery Map", "Recovery (%)", collector, air_rate)
+    st.plotly_chart(fig3, use_container_width=True)
+
+with col2:
+    fig4 = build_sweep_fig(sweep_grade, "Grade Map", "Grade (%)", collector, air_rate)
+    st.plotly_chart(fig4, use_container_width=True)
+
 # Reset button
-if st.button("Reset All Parameters"):
-    # Force page reload to reset all sliders
-    st.rerun()
\ No newline at end of file
+st.button("Reset All Parameters", on_click=reset_parameters)
@@ -0,0 +1,168 @@
+"""Zinc flotation performance model.
+
+Kept separate from the Streamlit script so the lookup arrays and the
+JIT-compiled kernels are built once per process instead of on every rerun.
+"""
+import math
+
+import numpy as np
+from numba import njit
+
+# Your existing lookup tables (abbreviated for demo), stored as parallel
+# sorted arrays: grid points (XP) and the recovery/grade value at each
+COLLECTOR_XP = np.array([200, 400, 650, 900, 1100, 1500], dtype=np.float64)
+COLLECTOR_FP_REC = np.array([15.0, 46.0, 70.0, 85.0, 93.0, 97.2])
+COLLECTOR_FP_GRADE = np.array([55.0, 52.5, 50.0, 47.5, 45.0, 40.0])
+
+AIR_RATE_XP = np.array([500, 1500], dtype=np.float64)
+AIR_RATE_FP_REC = np.array([30.0, 92.0])
+AIR_RATE_FP_GRADE = np.array([58.0, 22.0])
+
+FROTHER_XP = np.array([0, 25, 50, 75, 100], dtype=np.float64)
+FROTHER_FP_REC = np.array([60.0, 80.0, 86.5, 80.0, 66.0])
+FROTHER_FP_GRADE = np.array([47.0, 52.0, 54.0, 50.0, 45.0])
+
+# For pH the columns are a recovery multiplier and an additive grade bonus
+PH_XP = np.array([8.5, 9.0, 9.5, 10.0, 10.5, 11.0, 12.0])
+PH_FP_REC = np.array([1.0, 1.0, 1.0, 0.98, 0.95, 0.90, 0.40])
+PH_FP_GRADE = np.array([0.0, 3.9, 4.5, 5.0, 5.5, 7.5, 10.5])
+
+# Evenly spaced copies of the frother and pH grids, where the interpolation
+# bracket is found by index arithmetic instead of a search. The frother grid
+# is already uniform; pH is resampled onto its smallest knot spacing, which
+# only adds knots on straight segments and so leaves the curve unchanged.
+FROTHER_X0, FROTHER_DX = FROTHER_XP[0], FROTHER_XP[1] - FROTHER_XP[0]
+if not np.allclose(np.diff(FROTHER_XP), FROTHER_DX):
+    raise ValueError("FROTHER_XP must be evenly spaced for interp_uniform")
+
+PH_X0, PH_DX = PH_XP[0], np.diff(PH_XP).min()
+PH_UNIFORM_XP = PH_X0 + PH_DX * np.arange(int(round((PH_XP[-1] - PH_X0) / PH_DX)) + 1)
+if not np.allclose(PH_UNIFORM_XP[np.rint((PH_XP - PH_X0) / PH_DX).astype(int)], PH_XP):
+    raise ValueError("every PH_XP knot must lie on the resampled pH grid")
+PH_UNIFORM_FP_REC = np.interp(PH_UNIFORM_XP, PH_XP, PH_FP_REC)
+PH_UNIFORM_FP_GRADE = np.interp(PH_UNIFORM_XP, PH_XP, PH_FP_GRADE)
+
+# Slope of the feed-grade recovery factor over the 2-15% Zn range, kept as a
+# multiplier so the hot path doesn't divide
+ZN_RECOVERY_SCALE = 0.4 / (15.0 - 2.0)
+
+@njit(cache=True)
+def interp_scalar(value, xp, fp):
+    """Interpolate fp at value on the sorted grid xp, clamping to the end points"""
+    n = len(xp)
+    if value <= xp[0]:
+        return fp[0]
+    if value >= xp[n - 1]:
+        return fp[n - 1]
+    
+    # Bracketing keys via bisect-left on the sorted grid
+    hi = np.searchsorted(xp, value)
+    lo = hi - 1
+    
+    weight = (value - xp[lo]) / (xp[hi] - xp[lo])
+    return fp[lo] + weight * (fp[hi] - fp[lo])
+
+@njit(cache=True)
+def interp_uniform(value, x0, dx, fp):
+    """interp_scalar for the evenly spaced grid x0, x0 + dx, ..."""
+    n = len(fp)
+    pos = (value - x0) / dx
+    if pos <= 0.0:
+        return fp[0]
+    if pos >= n - 1:
+        return fp[n - 1]
+    
+    lo = int(pos)
+    weight = pos - lo
+    return fp[lo] + weight * (fp[lo + 1] - fp[lo])
+
+# The kernels below read the lookup arrays as globals, which Numba freezes
+# into the compiled code as constants. That avoids per-call reference
+# counting on array arguments (several times the cost of the model itself in
+# the batch loop), but means the tables must not be modified at runtime.
+@njit(cache=True)
+def calc_perf_core(collector, air_rate, frother, ph, luproset, mn_grade, zn_feed_grade):
+    """Compiled body of calculate_performance, returns (recovery, grade, carbon)"""
+    
+    # Get individual effects
+    collector_recovery = interp_scalar(collector, COLLECTOR_XP, COLLECTOR_FP_REC)
+    collector_grade = interp_scalar(collector, COLLECTOR_XP, COLLECTOR_FP_GRADE)
+    air_recovery = interp_scalar(air_rate, AIR_RATE_XP, AIR_RATE_FP_REC)
+    air_grade = interp_scalar(air_rate, AIR_RATE_XP, AIR_RATE_FP_GRADE)
+    frother_recovery = interp_uniform(frother, FROTHER_X0, FROTHER_DX, FROTHER_FP_REC)
+    frother_grade = interp_uniform(frother, FROTHER_X0, FROTHER_DX, FROTHER_FP_GRADE)
+    ph_recovery_multiplier = interp_uniform(ph, PH_X0, PH_DX, PH_UNIFORM_FP_REC)
+    ph_grade_bonus = interp_uniform(ph, PH_X0, PH_DX, PH_UNIFORM_FP_GRADE)
+    
+    # NEW: Calculate grade recovery factor based on Zn feed grade
+    # Higher feed grades have better recovery potential
+    # Scale from 0.6 (at 2% Zn) to 1.0 (at 15% Zn)
+    grade_recovery_factor = 0.7 + (zn_feed_grade - 2.0) * ZN_RECOVERY_SCALE
+    
+    # Weighted combination with feed grade factor
+    base_recovery = (collector_recovery * 0.40 + 
+                    air_recovery * 0.25 + 
+                    frother_recovery * 0.15 +
+                    88.0 * 0.25) * grade_recovery_factor
+    
+    # Apply pH multiplier
+    recovery = base_recovery * ph_recovery_multiplier
+    
+    # Luproset reduces recovery slightly
+    recovery -= luproset * 0.015
+    
+    # Grade calculation - higher feed grades can achieve slightly higher concentrate grades
+    feed_grade_bonus = (zn_feed_grade - 8.0) * 0.3  # Bonus/penalty from 8% baseline
+    
+    base_grade = (collector_grade * 0.45 + 
+                 air_grade * 0.30 + 
+                 frother_grade * 0.15 +
+                 50.0 * 0.10)
+    
+    grade = base_grade + ph_grade_bonus - (mn_grade*3) + feed_grade_bonus
+    
+    # Carbon content (affected by luproset)
+    carbon = 2.0 * math.exp(-luproset * 0.02)
+    
+    # Constraints
+    recovery = max(0.0, min(100.0, recovery))
+    grade = max(20.0, min(65.0, grade))
+    carbon = max(0.5, carbon)
+    
+    return recovery, grade, carbon
+
+
+@njit(cache=True)
+def calc_perf_loop(collector, air_rate, frother, ph, luproset, mn_grade, zn_feed_grade):
+    """calc_perf_core applied elementwise over equal-length 1-D arrays"""
+    n = len(collector)
+    recovery = np.empty(n)
+    grade = np.empty(n)
+    carbon = np.empty(n)
+    for i in range(n):
+        recovery[i], grade[i], carbon[i] = calc_perf_core(
+            collector[i], air_rate[i], frother[i], ph[i], luproset[i], mn_grade[i], zn_feed_grade[i]
+        )
+    return recovery, grade, carbon
+
+def calculate_performance(collector, air_rate, frother, ph, luproset, mn_grade, zn_feed_grade):
+    """Calculate flotation performance from parameters"""
+    return calc_perf_core(collector, air_rate, frother, ph, luproset, mn_grade, zn_feed_grade)
+
+def calculate_performance_batch(collector, air_rate, frother, ph, luproset, mn_grade, zn_feed_grade):
+    """Vectorized calculate_performance for parameter sweeps.
+    Each argument may be a scalar or an array; arrays are broadcast together
+    and (recovery, grade, carbon) come back as arrays of the broadcast shape.
+    Runs the same compiled calc_perf_core as the scalar path, once per point."""
+    params = np.broadcast_arrays(*(
+        np.asarray(value, dtype=np.float64)
+        for value in (collector, air_rate, frother, ph, luproset, mn_grade, zn_feed_grade)
+    ))
+    shape = params[0].shape
+    recovery, grade, carbon = calc_perf_loop(*(np.ravel(p) for p in params))
+    return recovery.reshape(shape), grade.reshape(shape), carbon.reshape(shape)
+
+# Compile up front (with the argument types the app passes) so the first
+# interaction isn't stalled by the JIT
+calculate_performance(200, 500, 0, 8.5, 0, 0.8, 8.0)
+calculate_performance_batch(200, 500, 0, 8.5, 0, 0.8, 8.0)